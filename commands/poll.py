@@ -12,62 +12,101 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
 from monitor.lib import ConversionFailure, Metric, Result
 from tplink.discover import LoadDevice
-from tplink.exceptions import ConnectionError
+from tplink.exceptions import ConnectionError, DeviceError
 from tplink.utils import IsValidIPv4
 
 
-def ProcessDevice(pipeline, name, config, logger=None):
-    address = config['address']
-    if not IsValidIPv4(address):
-        if logger:
-            logger.error('Invalid device configuration: {}'.format(name))
-        return False
+MAX_WORKERS = 32
+
+MEASUREMENT = 'emeter'
+
+# Keys every device entry in the config must provide.
+REQUIRED_FIELDS = ('address', 'device', 'measurements')
+
+
+def DevicePlan(name, config):
+    """
+    Build the polling plan for a device: the tags attached to its metric and
+    the tuple of realtime fields which should be recorded. Plans are built on
+    the calling thread before any work is handed to the worker pool.
+
+    :param name: Name of the device entry in the config.
+    :param config: Device configuration entry.
+    :return: Tuple of (tags, fields) or None if the entry is invalid.
+    """
+    if not IsValidIPv4(config['address']):
+        return None
+
+    fields = config['measurements'].get(MEASUREMENT)
+    if fields is None:
+        return None
 
+    tags = {'device': config['device']}
+    tags.update(config.get('tags', {}))
+    return tags, tuple(fields)
+
+
+def FetchDevice(name, config, logger=None):
+    """
+    Load a single device and query its realtime emeter data. This is the network
+    bound half of processing a device and is safe to run from a worker thread.
+
+    :param name: Name of the device entry in the config.
+    :param config: Device configuration entry.
+    :param logger: Optional logger instance.
+    :return: Realtime emeter data or None on failure.
+    """
+    address = config['address']
     try:
         device = LoadDevice(address, logger=logger)
     except ConnectionError as e:
         if logger:
-            logger.warning('Failed to connect to: {}'.format(address))
-        return True
+            logger.warning('Failed to connect to: %s', address)
+        return None
+
+    if device is None:
+        if logger:
+            logger.error("Unable to determine device type for '%s' (%s)", name, address)
+        return None
 
     if not device.HasEmeter():
         if logger:
-            logger.warning("Device '{}' does not support electronic metering".format(
-                device.GetAlias()))
-        return False
+            logger.warning("Device '%s' does not support electronic metering",
+                device.GetAlias())
+        return None
 
     emeter = device.GetEmeter()
     try:
         result = emeter.GetRealtime(cache=False)
     except ConnectionError:
         if logger:
-            logger.warning('Failed to get realtime data for: {}'.format(address))
-        return True
+            logger.warning('Failed to get realtime data for: %s', address)
+        return None
 
     if 'err_code' not in result or result['err_code'] != 0:
         if logger:
-            logger.error("Failed to load device '{}' emeter data".format(device.GetAlias()))
-        return False
+            logger.error("Failed to load device '%s' emeter data", device.GetAlias())
+        return None
 
-    tags = {'device': config['device']}
-    tags.update(config.get('tags', {}))
+    return result
 
-    metric = Metric(name, 'emeter', tags=tags)
-    measurements = config['measurements'][metric.measurement]
 
-    for key, value in result.items():
-        if key not in measurements:
+def ProcessDevice(name, plan, result):
+    [tags, fields] = plan
+    metric = Metric(name, MEASUREMENT, tags=tags)
+
+    for key in fields:
+        value = result.get(key)
+        if value is None:
             continue
         metric.AddField(key, value)
 
-    try:
-        pipeline(metric)
-    except ConversionFailure:
-        pass
-
-    return True
+    return metric
 
 
 def Poll(config, logger, pipeline):
@@ -79,11 +118,60 @@ def Poll(config, logger, pipeline):
     :return:
     """
     success = True
-    for device, cfg in config.items():
+
+    def Fetch(entry):
+        [device, cfg, _] = entry
         try:
-            ProcessDevice(pipeline, device, cfg, logger=logger)
+            return FetchDevice(device, cfg, logger=logger)
         except ConnectionError as e:
             if logger:
-                logger.error("Failed to connect to '{}': {}".format(device, e.message))
+                logger.error("Failed to connect to '%s': %s", device, e.message)
+        except DeviceError as e:
+            if logger:
+                logger.error("Failed to process device '%s': %s", device, e.message)
+        except Exception:
+            # Keep one misbehaving device from discarding the whole cycle.
+            if logger:
+                logger.exception("Unexpected error polling device '%s'", device)
+        return None
+
+    start = time.monotonic()
+    entries = []
+    for [device, cfg] in config.items():
+        missing = [key for key in REQUIRED_FIELDS if key not in cfg]
+        if missing:
+            if logger:
+                logger.error("Invalid device configuration '%s': missing %s",
+                    device, ', '.join(missing))
+            continue
+        plan = DevicePlan(device, cfg)
+        if plan is None:
+            if logger:
+                logger.error('Invalid device configuration: %s', device)
+            continue
+        entries.append((device, cfg, plan))
+    if not entries:
+        return Result.SUCCESS if success else Result.FAILURE
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(entries))) as executor:
+        results = list(executor.map(Fetch, entries))
+
+    metrics = []
+    for [device, _, plan], result in zip(entries, results):
+        if result is not None:
+            metrics.append(ProcessDevice(device, plan, result))
+
+    if logger and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Polled '%d' devices in %dms", len(entries),
+            int((time.monotonic() - start) * 1000))
+
+    if not metrics and logger:
+        logger.debug('No metrics to upload this cycle')
+
+    for metric in metrics:
+        try:
+            pipeline(metric)
+        except ConversionFailure:
+            pass
 
     return Result.SUCCESS if success else Result.FAILURE
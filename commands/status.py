@@ -12,26 +12,101 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+import sys
 from monitor.lib import ConfigError
 from tplink.discover import LoadDevice
 from tplink.utils import IsValidIPv4
 
 
+MAX_WORKERS = 16
+
+DURATION_UNITS = ('Weeks', 'Days', 'Hours', 'Minutes', 'Seconds')
+
+# Inclusive upper bounds of each RSSI band, ordered weakest to strongest. A
+# value equal to a threshold belongs to the lower band, hence bisect_left.
+RSSI_THRESHOLDS = (-90, -80, -70, -67, -30)
+RSSI_LABELS = ('N/A', 'Weak', 'Poor', 'Good', 'Very Good', 'Excellent')
+
+
+def DeviceReport(device):
+    """
+    Query a device and build its full status report. Every getter used here
+    may issue an RPC to the device so this is run from a worker thread.
+
+    :param device: Device to report on.
+    :return: Formatted multi-line report string.
+    """
+    isOn = device.IsOn()
+    out = ['-' * 30]
+    out.append('Device Information')
+    out.append('\tAddress: {}'.format(device.address))
+    out.append('\tAlias: {}'.format(device.GetAlias()))
+    out.append('\tDevice Type: {} ({})'.format(device.GetType(), device.GetTypeString()))
+    out.append('\tDevice Model: {}'.format(device.GetModel()))
+    out.append('\tDevice Identifier: {}'.format(device.GetDeviceIdentifier()))
+    out.append('\tDescription: {}'.format(device.GetDescription()))
+    out.append('')
+
+    out.append('Device State')
+    out.append('\tUptime: {}'.format(PrettyDuration(device.GetUptime())))
+    out.append('\tState: {}'.format('On' if isOn else 'Off'))
+
+    if device.IsPlug():
+        out.append('\tLED: {}'.format('On' if device.IsLedOn() else 'Off'))
+    if device.IsBulb():
+        isColorSupported = device.IsColorSupported()
+        out.append('\tColor Supported: {}'.format('Yes' if isColorSupported else 'No'))
+        out.append('\tBrightness Supported: {}'.format(
+            'Yes' if device.IsBrightnessSupported() else 'No'))
+        if isColorSupported and isOn:
+            out.append('\tHue: {}'.format(device.GetHue()))
+            out.append('\tSaturation: {}'.format(device.GetSaturation()))
+            out.append('\tBrightness: {}'.format(device.GetBrightness()))
+            out.append('\tTemperature: {}'.format(device.GetTemperature()))
+    out.append('')
+
+    if device.HasEmeter():
+        emeter = device.GetEmeter()
+        # The usage figures are all derived from the same day list, fetch it once.
+        usage = emeter.GetDailyUsage()
+        out.append('Electricity Meter')
+        out.append('\tAmperage: {} amps'.format(emeter.GetAmps()))
+        out.append('\tConsumption: {} watts'.format(emeter.GetConsumption()))
+        out.append('\tVoltage: {} volts'.format(emeter.GetVoltage()))
+        out.append('\tDaily Usage (kW/H): {}'.format(emeter.GetUsageToday(usage)))
+        out.append('\tAverage Daily Usage (kW/H): {}'.format(emeter.GetDailyAverage(usage)))
+        out.append('\tMonthly Usage (kW/H): {}'.format(emeter.GetUsageMonth(usage)))
+        out.append('\tAverage Monthly Usage (kW/H): {}'.format(
+            emeter.GetMonthlyAverage(usage)))
+        out.append('')
+
+    out.append('Version Information')
+    out.append('\tSoftware Version: {}'.format(device.GetSoftwareVersion()))
+    out.append('\tHardware Version: {}'.format(device.GetHardwareVersion()))
+    out.append('')
+
+    strength = device.GetSignalStrength()
+    out.append('Network Status')
+    out.append('\tMAC Address: {}'.format(device.GetMacAddress()))
+    out.append('\tWiFi Strength: {} ({})'.format(SignalStrength(strength), strength))
+    out.append('')
+
+    return '\n'.join(out) + '\n'
+
+
 def PrettyDuration(seconds, values=2):
-    table = [('Weeks', 604800), ('Days', 86400), ('Hours', 3600),
-             ('Minutes', 60), ('Seconds', 1)]
     if seconds <= 0:
         return 'N/A'
-    results = []
-    for (string, value) in table:
-        if len(results) == values:
-            break
-        count = int(seconds / value)
-        if count == 0:
-            continue
-        seconds -= (count * value)
-        results.append('{} {}'.format(count, string))
-    return ' '.join(results)
+    weeks, seconds = divmod(int(seconds), 604800)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    results = ['{} {}'.format(count, string)
+               for (count, string) in zip((weeks, days, hours, minutes, seconds), DURATION_UNITS)
+               if count]
+    return ' '.join(results[:values])
 
 
 def SignalStrength(value):
@@ -45,17 +120,7 @@ def SignalStrength(value):
     :param value: WiFI signal strength RSSI value
     :return: String represent signal strength
     """
-    if value > -30:
-        return 'Excellent'
-    if value > -67:
-        return 'Very Good'
-    if value > -70:
-        return 'Good'
-    if value > -80:
-        return 'Poor'
-    if value > -90:
-        return 'Weak'
-    return 'N/A'
+    return RSSI_LABELS[bisect_left(RSSI_THRESHOLDS, value)]
 
 
 def Status(config, args):
@@ -65,73 +130,30 @@ def Status(config, args):
         print('Failed to load config: {}'.format(e))
         return False
 
-    devices = []
-    for [name, cfg] in config.GetRoot().items():
-        device = LoadDevice(cfg['address'])
-        if device is None:
-            print('Failed to load device: {}'.format(name))
-            continue
-        devices.append(device)
+    # (label, address) pairs for every device to query, in report order.
+    targets = [(name, cfg['address']) for [name, cfg] in config.GetRoot().items()]
     if args.devices:
         for address in args.devices:
             if not IsValidIPv4(address):
                 print('Invalid IPv4 Address: {}'.format(address))
                 continue
-            device = LoadDevice(address)
+            targets.append((address, address))
+    if not targets:
+        print('Failed to load any devices')
+        return False
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(targets))) as executor:
+        devices = []
+        loaded = executor.map(LoadDevice, [address for (_, address) in targets])
+        for [label, _], device in zip(targets, loaded):
             if device is None:
-                print('Failed to load device: {}'.format(address))
+                print('Failed to load device: {}'.format(label))
                 continue
             devices.append(device)
-    if not devices:
-        print('Failed to load any devices')
-        return False
+        if not devices:
+            print('Failed to load any devices')
+            return False
 
-    for device in devices:
-        print('-' * 30)
-        print('Device Information')
-        print('\tAddress: {}'.format(device.address))
-        print('\tAlias: {}'.format(device.GetAlias()))
-        print('\tDevice Type: {} ({})'.format(device.GetType(), device.GetTypeString()))
-        print('\tDevice Model: {}'.format(device.GetModel()))
-        print('\tDevice Identifier: {}'.format(device.GetDeviceIdentifier()))
-        print('\tDescription: {}'.format(device.GetDescription()))
-        print()
-
-        print('Device State')
-        print('\tUptime: {}'.format(PrettyDuration(device.GetUptime())))
-        print('\tState: {}'.format('On' if device.IsOn() else 'Off'))
-
-        if device.IsPlug():
-            print('\tLED: {}'.format('On' if device.IsLedOn() else 'Off'))
-        if device.IsBulb():
-            print('\tColor Supported: {}'.format('Yes' if device.IsColorSupported() else 'No'))
-            print('\tBrightness Supported: {}'.format('Yes' if device.IsBrightnessSupported() else 'No'))
-            if device.IsColorSupported() and device.IsOn():
-                print('\tHue: {}'.format(device.GetHue()))
-                print('\tSaturation: {}'.format(device.GetSaturation()))
-                print('\tBrightness: {}'.format(device.GetBrightness()))
-                print('\tTemperature: {}'.format(device.GetTemperature()))
-        print()
-
-        if device.HasEmeter():
-            print('Electricity Meter')
-            emeter = device.GetEmeter()
-            print('\tAmperage: {} amps'.format(emeter.GetAmps()))
-            print('\tConsumption: {} watts'.format(emeter.GetConsumption()))
-            print('\tVoltage: {} volts'.format(emeter.GetVoltage()))
-            print('\tDaily Usage (kW/H): {}'.format(emeter.GetUsageToday()))
-            print('\tAverage Daily Usage (kW/H): {}'.format(emeter.GetDailyAverage()))
-            print('\tMonthly Usage (kW/H): {}'.format(emeter.GetUsageMonth()))
-            print('\tAverage Monthly Usage (kW/H): {}'.format(emeter.GetMonthlyAverage()))
-            print()
-
-        print('Version Information')
-        print('\tSoftware Version: {}'.format(device.GetSoftwareVersion()))
-        print('\tHardware Version: {}'.format(device.GetHardwareVersion()))
-        print()
-
-        print('Network Status')
-        print('\tMAC Address: {}'.format(device.GetMacAddress()))
-        strength = device.GetSignalStrength()
-        print('\tWiFi Strength: {} ({})'.format(SignalStrength(strength), strength))
-        print()
+        for report in executor.map(DeviceReport, devices):
+            sys.stdout.write(report)
+            sys.stdout.flush()
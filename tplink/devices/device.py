@@ -44,6 +44,8 @@ class Device(object):
         self.emeter = None
         self.cache = Cache()
         self.logger = logger
+        if info is not None:
+            self.cache.Insert('system', info)
 
     @staticmethod
     def Decrypt(message, key):
@@ -202,32 +204,26 @@ class Device(object):
     def Send(self, message):
         encrypted = self.Encrypt(message, self.key)
 
-        sock = None
         try:
-            sock = socket.create_connection((self.address, self.port), 3)
-            sock.send(encrypted)
-
-            buffer = bytes()
-            length = -1
-            while True:
-                chunk = sock.recv(4096)
-                if length == -1:
-                    length = struct.unpack(">I", chunk[0:4])[0]
-                buffer += chunk
-                if (length > 0 and len(buffer) >= length + 4) or not chunk:
-                    break
+            with socket.create_connection((self.address, self.port), 3) as sock:
+                sock.send(encrypted)
+
+                buffer = bytes()
+                length = -1
+                while True:
+                    chunk = sock.recv(4096)
+                    if length == -1:
+                        length = struct.unpack(">I", chunk[0:4])[0]
+                    buffer += chunk
+                    if (length > 0 and len(buffer) >= length + 4) or not chunk:
+                        break
         except OSError as e:
             if self.logger:
-                self.logger.exception('Error connecting to: {} ({})'.format(self.address, e))
+                self.logger.exception('Error connecting to: %s (%s)', self.address, e)
             raise ConnectionError(e.errno,
                 "Error connecting to '{}' ({}): [{}] {}".format(
                     self.GetType(), self.address, e.errno,
                     GetErrorMessage(e.errno) if e.errno else 'None'))
-        finally:
-            try:
-                sock.close()
-            except:
-                pass
 
         response = self.Decrypt(buffer[4:], self.key)
         return json.loads(response)
@@ -17,6 +17,18 @@ from ..exceptions import DeviceError
 from ..utils import Cache
 
 
+def ConvertMilli(value):
+    try:
+        return float(value) / 1000.0
+    except (TypeError, ValueError):
+        raise DeviceError('Invalid realtime emeter value: {}', value)
+
+
+# Realtime fields reported in milli-units by newer firmware. These are
+# renamed to their base-unit key and scaled on the way out.
+MILLI_SUFFIXES = ('_ma', '_mv', '_mw')
+
+
 class EmeterHandler(object):
 
     def __init__(self, device):
@@ -49,9 +61,10 @@ class EmeterHandler(object):
             return float(value['power'])
         raise DeviceError('Unknown output from emeter realtime')
 
-    def GetDailyAverage(self):
+    def GetDailyAverage(self, data=None):
         total = 0.0
-        data = self.GetDailyUsage()
+        if data is None:
+            data = self.GetDailyUsage()
         for day in data:
             if 'energy' in day:
                 total += float(day['energy'])
@@ -64,19 +77,24 @@ class EmeterHandler(object):
         return float(total / len(data))
 
     def GetDailyUsage(self, month=None, year=None):
+        if not month or not year:
+            now = datetime.now()
+            month = month or now.month
+            year = year or now.year
         response = self.Send(
             self.QueryHelper(self.emeterType,
                 'get_daystat', {
-                    'month': int(month or datetime.now().month),
-                    'year': int(year or datetime.now().year)
+                    'month': int(month),
+                    'year': int(year)
                 }))
 
         data = response[self.emeterType]['get_daystat']['day_list']
         return data
 
-    def GetMonthlyAverage(self):
+    def GetMonthlyAverage(self, data=None):
         total = 0.0
-        data = self.GetDailyUsage()
+        if data is None:
+            data = self.GetDailyUsage()
         for month in data:
             if 'energy' in month:
                 total += float(month['energy'])
@@ -111,12 +129,12 @@ class EmeterHandler(object):
             return data[self.emeterType]['get_realtime'].get(key)
         return data[self.emeterType]['get_realtime']
 
-    def GetUsageMonth(self):
-        data = self.GetDailyUsage()
-        month = datetime.now().month
-        year = datetime.now().year
+    def GetUsageMonth(self, data=None):
+        now = datetime.now()
+        if data is None:
+            data = self.GetDailyUsage(month=now.month, year=now.year)
         for entry in data:
-            if entry['month'] == month and entry['year'] == year:
+            if entry['month'] == now.month and entry['year'] == now.year:
                 if 'energy' in entry:
                     return float(entry['energy'])
                 elif 'energy_wh' in entry:
@@ -125,11 +143,12 @@ class EmeterHandler(object):
                     return float(-1)
         return float(-1)
 
-    def GetUsageToday(self):
-        data = self.GetDailyUsage()
-        today = datetime.now().day
+    def GetUsageToday(self, data=None):
+        now = datetime.now()
+        if data is None:
+            data = self.GetDailyUsage(month=now.month, year=now.year)
         for entry in data:
-            if entry['day'] == today:
+            if entry['day'] == now.day:
                 if 'energy' in entry:
                     return float(entry['energy'])
                 elif 'energy_wh' in entry:
@@ -153,9 +172,8 @@ class EmeterHandler(object):
         d = dict()
         emeter = data['emeter']['get_realtime']
         for key, value in emeter.items():
-            suffix = key[-3:]
-            if suffix in ['_ma', '_mv', '_mw']:
-                d[key[:-3]] = float(value) / 1000.0
+            if key[-3:] in MILLI_SUFFIXES:
+                d[key[:-3]] = ConvertMilli(value)
             else:
                 d[key] = value
         return {'emeter': {'get_realtime': d}}
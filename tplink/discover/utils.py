@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from ..devices import Bulb, Device, LightStrip, Plug
 from ..exceptions import DeviceError
 
 
+MAX_WORKERS = 16
+
+
 def GetDeviceType(info):
     deviceType = None
     sysinfo = None
@@ -38,11 +43,13 @@ def LoadDevices(addresses, logger=None):
     devices = []
     if not addresses or len(addresses) == 0:
         return []
-    for address in addresses:
-        device = LoadDevice(address, logger=logger)
+    addresses = list(addresses)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(addresses))) as executor:
+        loaded = list(executor.map(partial(LoadDevice, logger=logger), addresses))
+    for address, device in zip(addresses, loaded):
         if not device:
             if logger:
-                logger.error('Error: Unable to determine device type for: {}'.format(address))
+                logger.error('Error: Unable to determine device type for: %s', address)
             continue
         devices.append(device)
 